@@ -20,6 +20,15 @@ from iso4217 import Currency
 RAVEnDatum = Union[Optional[str], List[Optional[str]]]
 RAVEnData = Dict[str, RAVEnDatum]
 
+# RAVEn timestamps are seconds since the start of the year 2000
+_EPOCH = datetime(2000, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+
+_CURRENCIES: Dict[int, Currency] = {}
+for _currency in Currency:
+    _CURRENCIES.setdefault(_currency.number, _currency)
+del _currency
+
 
 def convert_str(raw: RAVEnDatum) -> Optional[str]:
     if raw is not None:
@@ -41,10 +50,9 @@ def convert_bool(raw: Optional[str]) -> Optional[bool]:
 
 def convert_currency(raw: Optional[str]) -> Optional[Currency]:
     if raw is not None:
-        number = int(raw, 0)
-        for currency in Currency:
-            if currency.number == number:
-                return currency
+        currency = _CURRENCIES.get(int(raw, 0))
+        if currency is not None:
+            return currency
         raise ValueError(f"Invalid currency number: '{raw}'")
     return None
 
@@ -73,10 +81,8 @@ def convert_datetime(
     utc: bool = False
 ) -> Optional[datetime]:
     if raw is not None and raw != '0xffffff':
-        value = datetime(
-            2000, 1, 1, 0, 0,
-            tzinfo=timezone.utc if utc else None)
-        return value + timedelta(seconds=int(raw, 0))
+        epoch = _EPOCH_UTC if utc else _EPOCH
+        return epoch + timedelta(seconds=int(raw, 0))
     return None
 
 
@@ -4,10 +4,14 @@
 from asyncio.events import AbstractEventLoop
 from asyncio.events import get_event_loop
 from asyncio.futures import Future
+from asyncio.protocols import BufferedProtocol
 from asyncio.protocols import Protocol
 from asyncio.transports import BaseTransport
 from typing import Any
+from typing import cast
+from typing import Iterator
 from typing import Optional
+from typing import Tuple
 import warnings
 import xml.etree.ElementTree as Et
 
@@ -16,12 +20,18 @@ from aioraven.device import UnknownRAVEnCommandWarning
 from aioraven.reader import RAVEnReader
 
 
-class RAVEnReaderProtocol(Protocol):
+class RAVEnReaderProtocol(BufferedProtocol, Protocol):
     """Deserialize data fragments from a RAVEn device."""
 
+    _buffer: bytearray
     _closed: Future[None]
+    _depth: int
+    _parser: 'Et.XMLPullParser[Et.Element]'
     _reader: Optional[RAVEnReader]
-    _stash: bytes
+    _root: Optional[Et.Element]
+    _used: int
+
+    BUFFER_SIZE = 65536
 
     def __init__(
         self,
@@ -41,11 +51,14 @@ class RAVEnReaderProtocol(Protocol):
             self._loop = loop
         self._reader = reader
         self._closed = self._loop.create_future()
+        self._buffer = bytearray(self.BUFFER_SIZE)
+        self._used = 0
 
     def _reset(self) -> None:
-        self._parser = Et.XMLPullParser(events=('end',))
+        self._parser = Et.XMLPullParser(events=('start', 'end'))
         self._parser.feed(b'<?xml version="1.0" encoding="ASCII"?><root>')
-        self._stash = b''
+        self._depth = 0
+        self._root = None
 
     def _get_close_waiter(self, stream: Any) -> Future[None]:
         return self._closed
@@ -66,27 +79,63 @@ class RAVEnReaderProtocol(Protocol):
                 self._closed.set_exception(exc)
         self._reader = None
 
-    def data_received(self, data: bytes) -> None:
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self._used == len(self._buffer):
+            # The buffer filled up without completing a tag
+            self._feed()
+        return memoryview(self._buffer)[self._used:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        start = self._used
+        self._used += nbytes
         if not self._reader:
+            self._used = 0
+            return
+
+        if self._buffer.find(b'>', start, self._used) == -1:
             return
 
-        self._stash += data
-        if b'>' not in data:
+        self._feed()
+
+    def data_received(self, data: bytes) -> None:
+        # Used by transports which don't support buffered protocols
+        view = memoryview(data)
+        while view:
+            buf = self.get_buffer(len(view))
+            nbytes = min(len(buf), len(view))
+            buf[:nbytes] = view[:nbytes]
+            self.buffer_updated(nbytes)
+            view = view[nbytes:]
+
+    def _feed(self) -> None:
+        if not self._reader:
+            self._used = 0
             return
 
-        self._parser.feed(self._stash)
-        self._stash = b''
+        self._parser.feed(memoryview(self._buffer)[:self._used])
+        self._used = 0
 
-        events = self._parser.read_events()
+        events = cast(
+            Iterator[Tuple[str, Et.Element]], self._parser.read_events())
         while True:
             try:
-                _, element = next(events)
+                event, element = next(events)
             except StopIteration:
                 return
             except Et.ParseError as err:
                 self._reader.set_exception(err)
                 self._reset()
-            else:
+                continue
+            if event == 'start':
+                if not self._depth:
+                    self._root = element
+                self._depth += 1
+                continue
+            self._depth -= 1
+            if self._depth != 1:
+                # Only complete top-level stanzas are of interest
+                continue
+            try:
                 if element.tag == 'Warning':
                     try:
                         e = next(iter(element), None)
@@ -101,6 +150,10 @@ class RAVEnReaderProtocol(Protocol):
                         self._reader.set_exception(err)
                 else:
                     self._reader.feed_element(element)
+            finally:
+                # Don't accumulate stanzas for the life of the connection
+                if self._root is not None:
+                    self._root.remove(element)
 
     def eof_received(self) -> None:
         if not self._reader:
@@ -38,7 +38,7 @@ class RAVEnReader:
             info.append('eof')
         if self._exception:
             info.append('e=%r' % self._exception)
-        num_waiters = sum(len(w) for w in self._waiters.values())
+        num_waiters = sum(map(len, self._waiters.values()))
         if num_waiters:
             info.append('w=%d' % num_waiters)
         return '<%s>' % ' '.join(info)
@@ -65,18 +65,23 @@ class RAVEnReader:
                     waiter.set_result(None)
 
     def feed_element(self, data: Et.Element) -> None:
-        self._waiters.setdefault(data.tag, [])
-        waiters = self._waiters.get(data.tag, [])
-        res: RAVEnData = {}
-        for e in data:
-            if e.tag in res:
-                orig = res[e.tag]
-                if not isinstance(orig, list):
-                    res[e.tag] = [orig, e.text]
+        waiters = self._waiters.get(data.tag)
+        if not waiters and not self._waiters[None]:
+            # Nobody is waiting for this element
+            return
+        res: RAVEnData = {e.tag: e.text for e in data}
+        if len(res) != len(data):
+            # Some tags appear more than once, so collect them into lists
+            res = {}
+            for e in data:
+                if e.tag in res:
+                    orig = res[e.tag]
+                    if not isinstance(orig, list):
+                        res[e.tag] = [orig, e.text]
+                    else:
+                        orig.append(e.text)
                 else:
-                    orig.append(e.text)
-            else:
-                res[e.tag] = e.text
+                    res[e.tag] = e.text
         while waiters:
             waiter = waiters.pop(0)
             if not waiter.cancelled():
@@ -84,18 +89,40 @@ class RAVEnReader:
                 break
         else:
             waiters = self._waiters[None]
-            if waiters:
-                waiters.pop(0).set_result(res)
+            while waiters:
+                waiter = waiters.pop(0)
+                if not waiter.cancelled():
+                    waiter.set_result(res)
+                    break
+
+    def register_tag_waiter(
+        self,
+        tag: Optional[str] = None,
+    ) -> Future[Optional[RAVEnData]]:
+        """
+        Wait for the next stanza with the given tag.
+
+        Unlike `read_tag()`, the waiter is registered immediately, so a
+        stanza which arrives before the returned future is awaited is not
+        missed.
+
+        :param tag: The tag of the stanza to wait for, or None to wait for a
+          stanza which no other waiter is interested in.
+
+        :returns: A future which resolves to the stanza's data, or None if
+          the end of the stream is reached first.
+        """
+        waiter: Future[Optional[RAVEnData]] = self._loop.create_future()
+        if self._eof:
+            waiter.set_result(None)
+        elif self._exception is not None:
+            waiter.set_exception(self._exception)
+        else:
+            self._waiters.setdefault(tag, []).append(waiter)
+        return waiter
 
     async def read_tag(
         self,
         tag: Optional[str] = None,
     ) -> Optional[RAVEnData]:
-        if self._eof:
-            return None
-        if self._exception is not None:
-            raise self._exception
-        self._waiters.setdefault(tag, [])
-        waiter: Future[Optional[RAVEnData]] = self._loop.create_future()
-        self._waiters[tag].append(waiter)
-        return await waiter
+        return await self.register_tag_waiter(tag)
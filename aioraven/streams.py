@@ -4,7 +4,7 @@
 import asyncio
 from asyncio.events import AbstractEventLoop
 from asyncio.events import get_event_loop
-from asyncio.tasks import Task
+from asyncio.futures import Future
 from asyncio.transports import WriteTransport
 from contextlib import AbstractAsyncContextManager
 from typing import Any
@@ -131,7 +131,25 @@ class RAVEnStreamDevice(
     async def synchronize(
         self, *, retries: int = 2, timeout: float = 1.0,
     ) -> None:
-        await asyncio.sleep(0.05)
+        if self._reader is not None:
+            # Consume anything already sent by the device, stopping once
+            # the connection has been quiet for a moment or a chatty device
+            # has used up the time budget.
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 0.05
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    res = await asyncio.wait_for(
+                        self._reader.read_tag(), min(0.01, remaining))
+                except Et.ParseError:
+                    continue
+                except (IOError, asyncio.TimeoutError):
+                    break
+                if res is None:
+                    break
         for _try in range(retries, -1, -1):
             try:
                 # Try a few times to communicate with the device,
@@ -151,15 +169,21 @@ class RAVEnStreamDevice(
     ) -> Optional[RAVEnData]:
         if not self._reader or not self._writer:
             raise RAVEnNotOpenError()
-        waiter: Optional[Task[Optional[RAVEnData]]] = None
+        exc = self._reader.exception()
+        if isinstance(exc, (OSError, asyncio.IncompleteReadError)):
+            # The connection has already failed, so don't bother writing
+            raise RAVEnConnectionError(f'{exc}') from exc
+        waiter: Optional[Future[Optional[RAVEnData]]] = None
         if res_name:
-            waiter = asyncio.create_task(self._reader.read_tag(res_name))
-            await asyncio.sleep(0)
+            waiter = self._reader.register_tag_waiter(res_name)
         try:
             self._writer.write_cmd(cmd_name, args)
             return await waiter if waiter is not None else None
         except (Et.ParseError, IOError) as ex:
             raise RAVEnConnectionError(f'{ex}') from ex
+        finally:
+            if waiter is not None:
+                waiter.cancel()
 
     async def __aenter__(self) -> 'RAVEnStreamDevice':
         await self.open()
@@ -0,0 +1,29 @@
+# Copyright 2022 Scott K Logan
+# Licensed under the Apache License, Version 2.0
+
+from collections.abc import AsyncIterator
+
+from aioraven.streams import RAVEnNetworkDevice
+import pytest_asyncio
+
+from .mock_device import MockServer
+
+
+@pytest_asyncio.fixture(scope='session')
+async def mock_server() -> AsyncIterator[MockServer]:
+    """Provide a mock device server which is shared by the whole session."""
+    server = MockServer({})
+    await server.start()
+    yield server
+    server.close()
+    await server.wait_connections()
+
+
+@pytest_asyncio.fixture(scope='session')
+async def raven_client(
+    mock_server: MockServer,
+) -> AsyncIterator[RAVEnNetworkDevice]:
+    """Provide a device connected to the shared mock device server."""
+    host, port = mock_server.address
+    async with RAVEnNetworkDevice(host, port) as dut:
+        yield dut
@@ -2,37 +2,61 @@
 # Licensed under the Apache License, Version 2.0
 
 import asyncio
+from collections import Counter
 from collections.abc import AsyncIterator
 from collections.abc import Awaitable
-from collections.abc import MutableMapping
+from collections.abc import Mapping
 from contextlib import asynccontextmanager
+import functools
 import os
+import re
 import sys
+from types import MappingProxyType
 from typing import BinaryIO
 from typing import Optional
-from typing import SupportsIndex
 from typing import TypeVar
 from typing import Union
+import weakref
 
+from aioraven.protocols import RAVEnReaderProtocol
+from aioraven.reader import RAVEnReader
+from aioraven.streams import RAVEnStreamDevice
+from aioraven.streams import RAVEnWriter
 import serial_asyncio_fast
 
 
 _T = TypeVar('_T')
 
 
-class _NoPopList(list[_T]):
+class _RepeatList(list[_T]):
+    """Responses which are never exhausted; the last one keeps repeating."""
 
-    def pop(self, index: SupportsIndex = -1) -> _T:
-        return self[index]
 
+_ResponseMapping = Mapping[
+    bytes, Optional[Union[list[Optional[bytes]], bytes]]]
 
-_ResponseMapping = MutableMapping[bytes, Optional[Union[list[bytes], bytes]]]
+# Requests and responses shared by the transport tests
+MAC_DEVICE = bytes.fromhex('0123456789ABCDEF')
 
-DEFAULT_RESPONSES: _ResponseMapping = {
+REQ_GET_METER_LIST = b'<Command><Name>get_meter_list</Name></Command>'
+RES_METER_LIST = (
+    b'<MeterList>'
+    b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
+    b'</MeterList>'
+)
+
+REQ_GET_DEVICE_INFO = b'<Command><Name>get_device_info</Name></Command>'
+RES_DEVICE_INFO = (
+    b'<DeviceInfo>'
+    b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
+    b'</DeviceInfo>'
+)
+
+DEFAULT_RESPONSES: _ResponseMapping = MappingProxyType({
     b'<Command>'
     b'<Name>get_current_price</Name>'
     b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-    b'</Command>': _NoPopList((
+    b'</Command>': _RepeatList((
         b'<PriceCluster>'
         b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
         b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -48,7 +72,7 @@ DEFAULT_RESPONSES: _ResponseMapping = {
     b'<Command>'
     b'<Name>get_current_summation_delivered</Name>'
     b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-    b'</Command>': _NoPopList((
+    b'</Command>': _RepeatList((
         b'<CurrentSummationDelivered>'
         b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
         b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -64,7 +88,7 @@ DEFAULT_RESPONSES: _ResponseMapping = {
     )),
     b'<Command>'
     b'<Name>get_device_info</Name>'
-    b'</Command>': _NoPopList((
+    b'</Command>': _RepeatList((
         b'<DeviceInfo>'
         b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
         b'    <InstallCode>0xABCDEF0123456789</InstallCode>'
@@ -80,7 +104,7 @@ DEFAULT_RESPONSES: _ResponseMapping = {
     b'<Command>'
     b'<Name>get_instantaneous_demand</Name>'
     b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-    b'</Command>': _NoPopList((
+    b'</Command>': _RepeatList((
         b'<InstantaneousDemand>'
         b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
         b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -96,7 +120,7 @@ DEFAULT_RESPONSES: _ResponseMapping = {
     b'<Command>'
     b'<Name>get_meter_info</Name>'
     b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-    b'</Command>': _NoPopList((
+    b'</Command>': _RepeatList((
         b'<MeterInfo>'
         b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
         b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -108,13 +132,13 @@ DEFAULT_RESPONSES: _ResponseMapping = {
         b'    <Enabled>Y</Enabled>'
         b'</MeterInfo>',
     )),
-    b'<Command><Name>get_meter_list</Name></Command>': _NoPopList((
+    b'<Command><Name>get_meter_list</Name></Command>': _RepeatList((
         b'<MeterList>'
         b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
         b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
         b'</MeterList>',
     )),
-    b'<Command><Name>get_network_info</Name></Command>': _NoPopList((
+    b'<Command><Name>get_network_info</Name></Command>': _RepeatList((
         b'<NetworkInfo>'
         b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
         b'    <CoordMacId>0xFEDCBA9876543210</CoordMacId>'
@@ -127,39 +151,130 @@ DEFAULT_RESPONSES: _ResponseMapping = {
         b'    <LinkStrength>0x24</LinkStrength>'
         b'</NetworkInfo>',
     )),
-}
+})
+
+
+def _is_available(
+    value: Optional[Union[list[Optional[bytes]], bytes]],
+    count: int,
+) -> bool:
+    if isinstance(value, _RepeatList):
+        return True
+    if isinstance(value, list):
+        return count < len(value)
+    return not count
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_requests(keys: tuple[bytes, ...]) -> re.Pattern[bytes]:
+    return re.compile(rb'\A\s*(?:' + b'|'.join(
+        b'(?P<k%d>%s)' % (i, re.escape(k)) for i, k in enumerate(keys)
+    ) + rb')')
+
+
+def _compile_responses(
+    responses: _ResponseMapping,
+    served: Counter[bytes],
+) -> tuple[Optional[re.Pattern[bytes]], tuple[bytes, ...]]:
+    # When one request is a prefix of another, the shorter one is completed
+    # first as the data arrives, so it should take precedence.
+    keys = tuple(sorted(
+        (k for k, v in responses.items() if _is_available(v, served[k])),
+        key=lambda k: (len(k), k)))
+    if not keys:
+        return None, keys
+    # The same sets of requests recur across tests and connections, so
+    # reuse the patterns which were already built for them
+    return _compile_requests(keys), keys
+
+
+class _ResponseMatcher:
+
+    def __init__(
+        self,
+        responses: _ResponseMapping,
+        served: Optional[Counter[bytes]] = None,
+    ) -> None:
+        self.reset(responses, served)
+
+    def reset(
+        self,
+        responses: _ResponseMapping,
+        served: Optional[Counter[bytes]] = None,
+    ) -> None:
+        """
+        Start matching against a new set of responses.
+
+        The responses are never modified. The number of times each request
+        has been answered is tracked in `served` instead, which may be shared
+        between matchers so that each response is only sent once.
+
+        :param dict responses: A mapping of request strings to responses.
+        :param Counter served: The number of times each request has already
+          been answered.
+        """
+        self._responses = responses
+        self.served = served if served is not None else Counter()
+        self._recompile()
+        self._buffer = bytearray()
+
+    def _recompile(self) -> None:
+        self._pattern, self._keys = _compile_responses(
+            self._responses, self.served)
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """
+        Consume request data and collect the responses to send back.
+
+        :param bytes data: Data received from the client.
+
+        :returns: The responses to the requests which were completed.
+        """
+        matched = []
+        self._buffer += data
+        while self._pattern is not None:
+            m = self._pattern.match(self._buffer)
+            if m is None:
+                break
+            # The name of the matching alternative identifies the request
+            # without copying it out of the buffer
+            assert m.lastgroup is not None
+            k = self._keys[int(m.lastgroup[1:])]
+            v = self._responses[k]
+            count = self.served[k]
+            if not _is_available(v, count):
+                # Consumed by another connection, so leave the request for
+                # any other candidates which remain
+                self._recompile()
+                continue
+            del self._buffer[:m.end()]
+            self.served[k] += 1
+            response = v[min(count, len(v) - 1)] if isinstance(v, list) else v
+            if response is not None:
+                matched.append(response)
+            if not _is_available(v, count + 1):
+                self._recompile()
+        return matched
 
 
 async def _device_loop(
     reader: asyncio.StreamReader,
     writer: asyncio.StreamWriter,
-    responses: _ResponseMapping
+    matcher: _ResponseMatcher
 ) -> None:
-    buffer = b''
     while True:
         try:
             try:
-                value = await reader.read(1)
+                value = await reader.read(4096)
             except asyncio.CancelledError:
                 break
             if not value:
                 break
-            buffer += value
-            buffer = buffer.lstrip()
-            for k, v in responses.items():
-                if buffer.startswith(k):
-                    if isinstance(v, list):
-                        first = v.pop(0)
-                        if first is not None:
-                            writer.write(first)
-                        if not v:
-                            del responses[k]
-                    else:
-                        if v is not None:
-                            writer.write(v)
-                        del responses[k]
-                    buffer = buffer[len(k):]
-                    break
+            responses = matcher.feed(value)
+            if responses:
+                # Send everything the request produced in one go
+                writer.writelines(responses)
+                await writer.drain()
         except asyncio.CancelledError:
             if not writer.can_write_eof():
                 break
@@ -178,40 +293,169 @@ async def mock_pty_device(
 
     import pty
 
+    loop = asyncio.get_running_loop()
     server, client = pty.openpty()
+    os.set_blocking(server, False)
+    matcher = _ResponseMatcher(responses)
 
-    server_in = os.fdopen(server, 'rb', 0, closefd=False)
-    server_out = os.fdopen(server, 'wb', 0, closefd=False)
+    pending = bytearray()
 
-    reader, writer, read_transport = await connect_pipes(server_in, server_out)
+    def on_writable() -> None:
+        try:
+            sent = os.write(server, pending)
+        except BlockingIOError:
+            return
+        except OSError:
+            # The client end of the terminal has gone away
+            sent = len(pending)
+        del pending[:sent]
+        if not pending:
+            loop.remove_writer(server)
+
+    def write(data: bytes) -> None:
+        if not pending:
+            try:
+                sent = os.write(server, data)
+            except BlockingIOError:
+                sent = 0
+            if sent == len(data):
+                return
+            loop.add_writer(server, on_writable)
+        else:
+            sent = 0
+        # Only the unsent remainder is copied into the pending buffer
+        pending.extend(memoryview(data)[sent:])
+
+    def on_readable() -> None:
+        try:
+            data = os.read(server, 4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            # The client end of the terminal has gone away
+            loop.remove_reader(server)
+            return
+        responses = matcher.feed(data)
+        if responses:
+            write(b''.join(responses))
 
     if initial_buffer is not None:
-        writer.write(initial_buffer)
-    task = asyncio.create_task(_device_loop(reader, writer, responses))
+        write(initial_buffer)
+    loop.add_reader(server, on_readable)
 
     yield os.ttyname(client)
 
-    task.cancel()
-
-    try:
-        await task
-    except asyncio.CancelledError:
-        pass
-
-    read_transport.close()
-    writer.close()
+    loop.remove_reader(server)
+    loop.remove_writer(server)
 
-    server_in.close()
-    server_out.close()
     os.close(server)
     os.close(client)
 
 
+class MockServer:
+    """A TCP endpoint which echoes verbatim responses to verbatim requests."""
+
+    def __init__(
+        self,
+        responses: Optional[_ResponseMapping] = None,
+        initial_buffer: Optional[bytes] = None
+    ) -> None:
+        """
+        Construct a MockServer.
+
+        The responses and initial buffer may be replaced while the server is
+        running using `set_responses()`.
+
+        :param dict responses: A mapping of request strings to responses.
+        :param bytes initial_buffer: Content to initialize the response
+          buffer.
+        """
+        if responses is None:
+            responses = DEFAULT_RESPONSES
+        self.responses = responses
+        self.initial_buffer = initial_buffer
+        self.served: Counter[bytes] = Counter()
+        self.connections: list[asyncio.Future[None]] = []
+        self._matchers: weakref.WeakSet[_ResponseMatcher] = weakref.WeakSet()
+        self._server: Optional[asyncio.Server] = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        assert self._server is not None
+        return self._server.sockets[0].getsockname()
+
+    def _client_connected(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> Awaitable[None]:
+        if self.initial_buffer is not None:
+            writer.write(self.initial_buffer)
+        matcher = _ResponseMatcher(self.responses, self.served)
+        self._matchers.add(matcher)
+        task = asyncio.ensure_future(_device_loop(reader, writer, matcher))
+        self.connections.append(task)
+        return task
+
+    def set_responses(
+        self,
+        responses: _ResponseMapping,
+        initial_buffer: Optional[bytes] = None
+    ) -> None:
+        """
+        Replace the responses served by the existing and future connections.
+
+        :param dict responses: A mapping of request strings to responses.
+        :param bytes initial_buffer: Content to initialize the response
+          buffer of future connections.
+        """
+        self.responses = responses
+        self.initial_buffer = initial_buffer
+        self.served = Counter()
+        for matcher in self._matchers:
+            matcher.reset(responses, self.served)
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._client_connected, host='127.0.0.1')
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    async def wait_connections(
+        self,
+        start: int = 0,
+        timeout: float = 0.1,
+    ) -> None:
+        """
+        Wait for the accepted connections to finish, cancelling stragglers.
+
+        :param int start: The number of earliest connections to leave alone.
+        :param float timeout: How long to wait before cancelling.
+        """
+        connections = self.connections[start:]
+        del self.connections[start:]
+        if not connections:
+            return
+
+        _, pending = await asyncio.wait(connections, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+
 @asynccontextmanager
 async def mock_device(
     responses: Optional[_ResponseMapping] = None,
-    initial_buffer: Optional[bytes] = None
-) -> AsyncIterator[None]:
+    initial_buffer: Optional[bytes] = None,
+    *,
+    server: Optional[MockServer] = None,
+) -> AsyncIterator[tuple[str, int]]:
     """
     Create a mock device at a TCP endpoint.
 
@@ -220,37 +464,119 @@ async def mock_device(
 
     :param dict responses: A mapping of request strings to responses.
     :param bytes initial_buffer: Content to initialize the response buffer.
+    :param server: A running server to serve the responses from instead of
+      starting a new one.
 
     :returns: A tuple including the host and port of the TCP endpoint.
     """
     if responses is None:
         responses = DEFAULT_RESPONSES
 
-    connections = []
-
-    def client_connected(
-        reader: asyncio.StreamReader,
-        writer: asyncio.StreamWriter
-    ) -> Awaitable[None]:
-        if initial_buffer is not None:
-            writer.write(initial_buffer)
-        task = asyncio.create_task(_device_loop(reader, writer, responses))
-        connections.append(task)
-        return asyncio.wait_for(task, None)
+    if server is None:
+        server = MockServer(responses, initial_buffer)
+        await server.start()
+        try:
+            yield server.address
+        finally:
+            server.close()
+        await server.wait_connections()
+        return
 
-    server = await asyncio.start_server(client_connected, host='127.0.0.1')
+    accepted = len(server.connections)
+    orig = server.responses, server.initial_buffer
+    server.set_responses(responses, initial_buffer)
     try:
-        yield server.sockets[0].getsockname()
+        yield server.address
+        await server.wait_connections(accepted)
     finally:
-        server.close()
-    if not connections:
-        return
+        server.set_responses(*orig)
+
+
+class _MemoryTransport(asyncio.Transport):
+    """A transport which answers writes directly from a response matcher."""
+
+    def __init__(
+        self,
+        protocol: asyncio.Protocol,
+        matcher: _ResponseMatcher,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        super().__init__()
+        self._protocol = protocol
+        self._matcher = matcher
+        self._loop = loop
+        self._closing = False
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        if self._closing:
+            return
+        for response in self._matcher.feed(bytes(data)):
+            self._loop.call_soon(self._protocol.data_received, response)
+
+    def can_write_eof(self) -> bool:
+        return False
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self) -> None:
+        if not self._closing:
+            self._closing = True
+            self._loop.call_soon(self._protocol.connection_lost, None)
+
+    def abort(self) -> None:
+        self.close()
+
+
+class _MemoryDevice(RAVEnStreamDevice):
+
+    def __init__(
+        self,
+        responses: _ResponseMapping,
+        initial_buffer: Optional[bytes],
+    ) -> None:
+        self._responses = responses
+        self._initial_buffer = initial_buffer
+        self.served: Counter[bytes] = Counter()
+
+    async def open(self) -> None:
+        if self._reader or self._writer:
+            return
+        loop = asyncio.get_running_loop()
+        reader = RAVEnReader(loop=loop)
+        protocol = RAVEnReaderProtocol(reader, loop=loop)
+        transport = _MemoryTransport(
+            protocol, _ResponseMatcher(self._responses, self.served), loop)
+        protocol.connection_made(transport)
+        if self._initial_buffer is not None:
+            loop.call_soon(protocol.data_received, self._initial_buffer)
+        self._reader = reader
+        self._writer = RAVEnWriter(transport, protocol)
+
+
+@asynccontextmanager
+async def mock_memory_device(
+    responses: Optional[_ResponseMapping] = None,
+    initial_buffer: Optional[bytes] = None,
+) -> AsyncIterator[_MemoryDevice]:
+    """
+    Create an open device connected to an in-memory mock device.
+
+    Requests written to the device are answered without passing through any
+    sockets, which keeps tests of the data handling fast. The number of times
+    each request was answered is available from the device's `served`
+    attribute.
+
+    :param dict responses: A mapping of request strings to responses.
+    :param bytes initial_buffer: Content to initialize the response buffer.
+
+    :returns: The open device.
+    """
+    if responses is None:
+        responses = DEFAULT_RESPONSES
 
-    _, pending = await asyncio.wait(connections, timeout=0.1)
-    for task in pending:
-        task.cancel()
-    if pending:
-        await asyncio.wait(pending)
+    async with _MemoryDevice(responses, initial_buffer) as dut:
+        yield dut
 
 
 async def connect_pipes(
@@ -283,7 +609,7 @@ async def main(argv: list[str] = sys.argv) -> Optional[int]:
     else:
         print(f'Usage: {argv[0]} [DEVICE_PATH]', file=sys.stderr)
         return 1
-    await _device_loop(reader, writer, DEFAULT_RESPONSES)
+    await _device_loop(reader, writer, _ResponseMatcher(DEFAULT_RESPONSES))
     if read_transport is not None:
         read_transport.close()
     return 0
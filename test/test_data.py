@@ -2,11 +2,11 @@
 # Licensed under the Apache License, Version 2.0
 
 import asyncio
+from dataclasses import replace
 from datetime import date
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
-import warnings
 
 from aioraven.data import ConnectionState
 from aioraven.data import CurrentPeriodUsage
@@ -31,122 +31,214 @@ from aioraven.data import TimeCluster
 from aioraven.device import RAVEnConnectionError
 from aioraven.device import RAVEnWarning
 from aioraven.device import UnknownRAVEnCommandWarning
-from aioraven.streams import RAVEnNetworkDevice
 from iso4217 import Currency
 import pytest
 
 from .mock_device import mock_device
-
-
-@pytest.mark.asyncio
-@pytest.mark.parametrize('meter', (bytes.fromhex('FEDCBA9876543210'), None))
+from .mock_device import mock_memory_device
+
+
+_MAC_DEVICE = bytes.fromhex('0123456789ABCDEF')
+_MAC_METER_A = bytes.fromhex('FEDCBA9876543210')
+_MAC_METER_B = bytes.fromhex('FEDCBA0123456789')
+_INSTALL_CODE = bytes.fromhex('ABCDEF0123456789')
+_LINK_KEY = bytes.fromhex('ABCDEF0123456789ABCDEF0123456789')
+_MSG_ID = bytes.fromhex('02468ACE')
+_EXT_PAN = bytes.fromhex('9876543210ABCDEF')
+_SHORT_ADDR = bytes.fromhex('5678')
+_STATUS_CODE = bytes.fromhex('42')
+_TIME_STAMP = datetime(2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc)
+
+_METER_PARAMS = pytest.mark.parametrize('meter', (
+    pytest.param(_MAC_METER_A, id='meter'),
+    pytest.param(None, id='default'),
+))
+
+_REQ_CLOSE_CURRENT_PERIOD = (
+    b'<Command><Name>close_current_period</Name></Command>')
+_REQ_CLOSE_CURRENT_PERIOD_METER = (
+    b'<Command>'
+    b'<Name>close_current_period</Name>'
+    b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
+    b'</Command>'
+)
+_REQ_GET_CURRENT_PERIOD_USAGE = (
+    b'<Command><Name>get_current_period_usage</Name></Command>')
+_REQ_GET_CURRENT_PERIOD_USAGE_METER = (
+    b'<Command>'
+    b'<Name>get_current_period_usage</Name>'
+    b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
+    b'</Command>'
+)
+_REQ_GET_CURRENT_SUMMATION_DELIVERED = (
+    b'<Command><Name>get_current_summation_delivered</Name></Command>')
+_REQ_GET_CURRENT_SUMMATION_DELIVERED_METER = (
+    b'<Command>'
+    b'<Name>get_current_summation_delivered</Name>'
+    b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
+    b'</Command>'
+)
+_REQ_GET_CURRENT_PRICE = b'<Command><Name>get_current_price</Name></Command>'
+_REQ_GET_CURRENT_PRICE_METER = (
+    b'<Command>'
+    b'<Name>get_current_price</Name>'
+    b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
+    b'</Command>'
+)
+_REQ_GET_DEVICE_INFO = b'<Command><Name>get_device_info</Name></Command>'
+_REQ_GET_INSTANTANEOUS_DEMAND = (
+    b'<Command><Name>get_instantaneous_demand</Name></Command>')
+_REQ_GET_LAST_PERIOD_USAGE = (
+    b'<Command><Name>get_last_period_usage</Name></Command>')
+_REQ_GET_MESSAGE = b'<Command><Name>get_message</Name></Command>'
+_REQ_GET_METER_INFO = b'<Command><Name>get_meter_info</Name></Command>'
+_REQ_GET_METER_LIST = b'<Command><Name>get_meter_list</Name></Command>'
+_REQ_GET_NETWORK_INFO = b'<Command><Name>get_network_info</Name></Command>'
+_REQ_GET_SCHEDULE = b'<Command><Name>get_schedule</Name></Command>'
+_REQ_GET_TIME = b'<Command><Name>get_time</Name></Command>'
+_REQ_GET_PROFILE_DATA = (
+    b'<Command>'
+    b'<Name>get_profile_data</Name>'
+    b'<NumberOfPeriods>0x02</NumberOfPeriods>'
+    b'<EndTime>0x29bd58a7</EndTime>'
+    b'<IntervalChannel>Delivered</IntervalChannel>'
+    b'</Command>'
+)
+
+_RES_CURRENT_PERIOD_USAGE = (
+    b'<CurrentPeriodUsage>'
+    b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
+    b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
+    b'    <TimeStamp>0x29bd58a7</TimeStamp>'
+    b'    <CurrentUsage>0x00000010</CurrentUsage>'
+    b'    <Multiplier>0x00000004</Multiplier>'
+    b'    <Divisor>0x00000002</Divisor>'
+    b'    <DigitsRight>0x02</DigitsRight>'
+    b'    <DigitsLeft>0x04</DigitsLeft>'
+    b'    <SuppressLeadingZero>N</SuppressLeadingZero>'
+    b'    <StartDate>0x29AAE3A7</StartDate>'
+    b'</CurrentPeriodUsage>'
+)
+_RES_SUMMATION_DELIVERED = (
+    b'<CurrentSummationDelivered>'
+    b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
+    b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
+    b'    <TimeStamp>0x29bd58a7</TimeStamp>'
+    b'    <SummationDelivered>0x00000010</SummationDelivered>'
+    b'    <SummationReceived>0x00000008</SummationReceived>'
+    b'    <Multiplier>0x00000004</Multiplier>'
+    b'    <Divisor>0x00000002</Divisor>'
+    b'    <DigitsRight>0x02</DigitsRight>'
+    b'    <DigitsLeft>0x04</DigitsLeft>'
+    b'    <SuppressLeadingZero>N</SuppressLeadingZero>'
+    b'</CurrentSummationDelivered>'
+)
+_RES_PRICE_CLUSTER = (
+    b'<PriceCluster>'
+    b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
+    b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
+    b'    <TimeStamp>0x29bd58a7</TimeStamp>'
+    b'    <Price>0xc8</Price>'
+    b'    <Currency>0x348</Currency>'
+    b'    <TrailingDigits>0x03</TrailingDigits>'
+    b'    <Tier>0x08</Tier>'
+    b'    <TierLabel>Set by User</TierLabel>'
+    b'    <RateLabel>Set by User</RateLabel>'
+    b'</PriceCluster>'
+)
+_RES_METER_LIST = (
+    b'<MeterList>'
+    b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
+    b'</MeterList>'
+)
+_RES_WARNING_GENERIC = (
+    b'<Warning>'
+    b'    <Text>Something unexpected happened</Text>'
+    b'</Warning>'
+)
+
+_EXPECTED_CURRENT_PERIOD_USAGE = CurrentPeriodUsage(
+    device_mac_id=_MAC_DEVICE,
+    meter_mac_id=_MAC_METER_A,
+    time_stamp=_TIME_STAMP,
+    current_usage='0032.00',
+    start_date=datetime(2022, 2, 25, 0, 47, 35, tzinfo=timezone.utc))
+_EXPECTED_SUMMATION_DELIVERED = CurrentSummationDelivered(
+    device_mac_id=_MAC_DEVICE,
+    meter_mac_id=_MAC_METER_A,
+    time_stamp=_TIME_STAMP,
+    summation_delivered='0032.00',
+    summation_received='0016.00')
+_EXPECTED_PRICE_CLUSTER = PriceCluster(
+    device_mac_id=_MAC_DEVICE,
+    meter_mac_id=_MAC_METER_A,
+    time_stamp=_TIME_STAMP,
+    price='0.20',
+    currency=Currency.usd,
+    tier=8,
+    tier_label='Set by User',
+    rate_label='Set by User')
+
+
+@_METER_PARAMS
 async def test_close_current_period(meter):
     """Verify behavior of the ``close_current_period`` command."""
     responses = {
-        b'<Command><Name>close_current_period</Name></Command>': None,
-        b'<Command>'
-        b'<Name>close_current_period</Name>'
-        b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-        b'</Command>': None,
+        _REQ_CLOSE_CURRENT_PERIOD: None,
+        _REQ_CLOSE_CURRENT_PERIOD_METER: None,
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            await dut.close_current_period(meter=meter)
+    async with mock_memory_device(responses) as dut:
+        await dut.close_current_period(meter=meter)
 
-    assert 1 == len(responses)
+    request = (
+        _REQ_CLOSE_CURRENT_PERIOD if meter is None
+        else _REQ_CLOSE_CURRENT_PERIOD_METER)
+    assert dut.served == {request: 1}
 
 
-@pytest.mark.asyncio
-@pytest.mark.parametrize('meter', (bytes.fromhex('FEDCBA9876543210'), None))
-async def test_get_current_period_usage(meter):
+@_METER_PARAMS
+async def test_get_current_period_usage(meter, mock_server, raven_client):
     """Verify behavior of the ``get_current_period_usage`` command."""
     responses = {
-        b'<Command><Name>get_current_period_usage</Name></Command>':
-            b'<CurrentPeriodUsage>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'    <TimeStamp>0x29bd58a7</TimeStamp>'
-            b'    <CurrentUsage>0x00000010</CurrentUsage>'
-            b'    <Multiplier>0x00000004</Multiplier>'
-            b'    <Divisor>0x00000002</Divisor>'
-            b'    <DigitsRight>0x02</DigitsRight>'
-            b'    <DigitsLeft>0x04</DigitsLeft>'
-            b'    <SuppressLeadingZero>N</SuppressLeadingZero>'
-            b'    <StartDate>0x29AAE3A7</StartDate>'
-            b'</CurrentPeriodUsage>',
+        _REQ_GET_CURRENT_PERIOD_USAGE: _RES_CURRENT_PERIOD_USAGE,
+        _REQ_GET_CURRENT_PERIOD_USAGE_METER: _RES_CURRENT_PERIOD_USAGE,
     }
-    responses[
-        b'<Command>'
-        b'<Name>get_current_period_usage</Name>'
-        b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-        b'</Command>'
-    ] = responses[b'<Command><Name>get_current_period_usage</Name></Command>']
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_current_period_usage(
-                meter=meter,
-            )
-
-    assert actual == CurrentPeriodUsage(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        current_usage='0032.00',
-        start_date=datetime(
-            2022, 2, 25, 0, 47, 35, tzinfo=timezone.utc))
-
-
-@pytest.mark.asyncio
-@pytest.mark.parametrize('meter', (bytes.fromhex('FEDCBA9876543210'), None))
-async def test_get_current_summation_delivered(meter):
+
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_current_period_usage(
+            meter=meter,
+        )
+
+    assert actual == _EXPECTED_CURRENT_PERIOD_USAGE
+
+
+@_METER_PARAMS
+async def test_get_current_summation_delivered(
+    meter, mock_server, raven_client,
+):
     """Verify behavior of the ``get_current_summation_delivered`` command."""
     responses = {
-        b'<Command><Name>get_current_summation_delivered</Name></Command>':
-            b'<CurrentSummationDelivered>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'    <TimeStamp>0x29bd58a7</TimeStamp>'
-            b'    <SummationDelivered>0x00000010</SummationDelivered>'
-            b'    <SummationReceived>0x00000008</SummationReceived>'
-            b'    <Multiplier>0x00000004</Multiplier>'
-            b'    <Divisor>0x00000002</Divisor>'
-            b'    <DigitsRight>0x02</DigitsRight>'
-            b'    <DigitsLeft>0x04</DigitsLeft>'
-            b'    <SuppressLeadingZero>N</SuppressLeadingZero>'
-            b'</CurrentSummationDelivered>',
+        _REQ_GET_CURRENT_SUMMATION_DELIVERED: _RES_SUMMATION_DELIVERED,
+        _REQ_GET_CURRENT_SUMMATION_DELIVERED_METER: _RES_SUMMATION_DELIVERED,
     }
-    responses[
-        b'<Command>'
-        b'<Name>get_current_summation_delivered</Name>'
-        b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-        b'</Command>'
-    ] = responses[
-        b'<Command><Name>get_current_summation_delivered</Name></Command>']
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_current_summation_delivered(meter=meter)
-
-    assert actual == CurrentSummationDelivered(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        summation_delivered='0032.00',
-        summation_received='0016.00')
-
-
-@pytest.mark.asyncio
-async def test_get_current_summation_delivered_rounding():
+
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_current_summation_delivered(
+            meter=meter)
+
+    assert actual == _EXPECTED_SUMMATION_DELIVERED
+
+
+async def test_get_current_summation_delivered_rounding(
+    mock_server, raven_client,
+):
     """
     Verify rounding behavior of the ``get_current_summation_delivered``
     command.
     """
     responses = {
-        b'<Command><Name>get_current_summation_delivered</Name></Command>':
+        _REQ_GET_CURRENT_SUMMATION_DELIVERED:
             b'<CurrentSummationDelivered>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -161,27 +253,24 @@ async def test_get_current_summation_delivered_rounding():
             b'</CurrentSummationDelivered>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_current_summation_delivered()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_current_summation_delivered()
 
-    assert actual == CurrentSummationDelivered(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
+    assert actual == replace(
+        _EXPECTED_SUMMATION_DELIVERED,
         summation_delivered='032.0',
         summation_received='016.0')
 
 
-@pytest.mark.asyncio
-async def test_get_current_summation_delivered_no_received():
+async def test_get_current_summation_delivered_no_received(
+    mock_server, raven_client,
+):
     """
     Verify behavior of the ``get_current_summation_delivered`` command without
     SummationReceived.
     """
     responses = {
-        b'<Command><Name>get_current_summation_delivered</Name></Command>':
+        _REQ_GET_CURRENT_SUMMATION_DELIVERED:
             b'<CurrentSummationDelivered>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -195,67 +284,33 @@ async def test_get_current_summation_delivered_no_received():
             b'</CurrentSummationDelivered>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_current_summation_delivered()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_current_summation_delivered()
 
-    assert actual == CurrentSummationDelivered(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        summation_delivered='0032.00',
-        summation_received=None)
+    assert actual == replace(
+        _EXPECTED_SUMMATION_DELIVERED, summation_received=None)
 
 
-@pytest.mark.asyncio
-@pytest.mark.parametrize('meter', (bytes.fromhex('FEDCBA9876543210'), None))
-async def test_get_current_price(meter):
+@_METER_PARAMS
+async def test_get_current_price(meter, mock_server, raven_client):
     """Verify behavior of the ``get_current_price`` command."""
     responses = {
-        b'<Command><Name>get_current_price</Name></Command>':
-            b'<PriceCluster>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'    <TimeStamp>0x29bd58a7</TimeStamp>'
-            b'    <Price>0xc8</Price>'
-            b'    <Currency>0x348</Currency>'
-            b'    <TrailingDigits>0x03</TrailingDigits>'
-            b'    <Tier>0x08</Tier>'
-            b'    <TierLabel>Set by User</TierLabel>'
-            b'    <RateLabel>Set by User</RateLabel>'
-            b'</PriceCluster>',
+        _REQ_GET_CURRENT_PRICE: _RES_PRICE_CLUSTER,
+        _REQ_GET_CURRENT_PRICE_METER: _RES_PRICE_CLUSTER,
     }
-    responses[
-        b'<Command>'
-        b'<Name>get_current_price</Name>'
-        b'<MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-        b'</Command>'
-    ] = responses[b'<Command><Name>get_current_price</Name></Command>']
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_current_price(meter=meter)
-
-    assert actual == PriceCluster(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        price='0.20',
-        currency=Currency.usd,
-        tier=8,
-        tier_label='Set by User',
-        rate_label='Set by User')
-
-
-@pytest.mark.asyncio
-async def test_get_current_price_no_currency():
+
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_current_price(meter=meter)
+
+    assert actual == _EXPECTED_PRICE_CLUSTER
+
+
+async def test_get_current_price_no_currency(mock_server, raven_client):
     """
     Verify behavior of the ``get_current_price`` command without Currency.
     """
     responses = {
-        b'<Command><Name>get_current_price</Name></Command>':
+        _REQ_GET_CURRENT_PRICE:
             b'<PriceCluster>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -268,29 +323,19 @@ async def test_get_current_price_no_currency():
             b'</PriceCluster>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_current_price()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_current_price()
 
-    assert actual == PriceCluster(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        price='0.2',
-        currency=None,
-        tier=8,
-        tier_label='Set by User',
-        rate_label='Set by User')
+    assert actual == replace(
+        _EXPECTED_PRICE_CLUSTER, price='0.2', currency=None)
 
 
-@pytest.mark.asyncio
-async def test_get_current_price_no_time_stamp():
+async def test_get_current_price_no_time_stamp(mock_server, raven_client):
     """
     Verify behavior of the ``get_current_price`` command without TimeStamp.
     """
     responses = {
-        b'<Command><Name>get_current_price</Name></Command>':
+        _REQ_GET_CURRENT_PRICE:
             b'<PriceCluster>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -303,26 +348,16 @@ async def test_get_current_price_no_time_stamp():
             b'</PriceCluster>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_current_price()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_current_price()
 
-    assert actual == PriceCluster(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=None,
-        price='0.20',
-        currency=Currency.usd,
-        tier=8,
-        tier_label='Set by User',
-        rate_label='Set by User')
+    assert actual == replace(_EXPECTED_PRICE_CLUSTER, time_stamp=None)
 
 
-@pytest.mark.asyncio
-async def test_get_device_info():
+async def test_get_device_info(mock_server, raven_client):
     """Verify behavior of the ``get_device_info`` command."""
     responses = {
-        b'<Command><Name>get_device_info</Name></Command>':
+        _REQ_GET_DEVICE_INFO:
             b'<DeviceInfo>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <InstallCode>0xABCDEF0123456789</InstallCode>'
@@ -336,14 +371,13 @@ async def test_get_device_info():
             b'</DeviceInfo>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_device_info()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_device_info()
 
     assert actual == DeviceInfo(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        install_code=bytes.fromhex('ABCDEF0123456789'),
-        link_key=bytes.fromhex('ABCDEF0123456789ABCDEF0123456789'),
+        device_mac_id=_MAC_DEVICE,
+        install_code=_INSTALL_CODE,
+        link_key=_LINK_KEY,
         fw_version='1.21g',
         hw_version='5.55 rev 2',
         image_type='Mocked',
@@ -352,202 +386,79 @@ async def test_get_device_info():
         date_code=(date(2022, 1, 1), 'a0000042'))
 
 
-@pytest.mark.asyncio
-async def test_get_instantaneous_demand():
-    """Verify behavior of the ``get_instantaneous_demand`` command."""
-    responses = {
-        b'<Command><Name>get_instantaneous_demand</Name></Command>':
-            b'<InstantaneousDemand>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'    <TimeStamp>0x29bd58a7</TimeStamp>'
-            b'    <Demand>0x00000010</Demand>'
-            b'    <Multiplier>0x00000004</Multiplier>'
-            b'    <Divisor>0x00000002</Divisor>'
-            b'    <DigitsRight>0x02</DigitsRight>'
-            b'    <DigitsLeft>0x04</DigitsLeft>'
-            b'    <SuppressLeadingZero>Y</SuppressLeadingZero>'
-            b'</InstantaneousDemand>',
-    }
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_instantaneous_demand()
-
-    assert actual == InstantaneousDemand(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        demand='32.00')
-
-
-@pytest.mark.asyncio
-async def test_get_instantaneous_demand_negative():
-    """
-    Verify behavior of the ``get_instantaneous_demand`` command with a
-    negative value.
-    """
-    responses = {
-        b'<Command><Name>get_instantaneous_demand</Name></Command>':
-            b'<InstantaneousDemand>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'    <TimeStamp>0x29bd58a7</TimeStamp>'
-            b'    <Demand>0xFFFFFFF0</Demand>'
-            b'    <Multiplier>0x00000004</Multiplier>'
-            b'    <Divisor>0x00000002</Divisor>'
-            b'    <DigitsRight>0x02</DigitsRight>'
-            b'    <DigitsLeft>0x04</DigitsLeft>'
-            b'    <SuppressLeadingZero>Y</SuppressLeadingZero>'
-            b'</InstantaneousDemand>',
-    }
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_instantaneous_demand()
-
-    assert actual == InstantaneousDemand(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        demand='-32.00')
-
-
-@pytest.mark.asyncio
-async def test_get_instantaneous_demand_negative_no_slz():
+@pytest.mark.parametrize('demand,formatting,expected', (
+    pytest.param(
+        b'0x00000010',
+        b'    <DigitsRight>0x02</DigitsRight>'
+        b'    <DigitsLeft>0x04</DigitsLeft>'
+        b'    <SuppressLeadingZero>Y</SuppressLeadingZero>',
+        '32.00',
+        id='positive'),
+    pytest.param(
+        b'0xFFFFFFF0',
+        b'    <DigitsRight>0x02</DigitsRight>'
+        b'    <DigitsLeft>0x04</DigitsLeft>'
+        b'    <SuppressLeadingZero>Y</SuppressLeadingZero>',
+        '-32.00',
+        id='negative'),
+    pytest.param(
+        b'0xFFFFFFF0',
+        b'    <DigitsRight>0x02</DigitsRight>'
+        b'    <DigitsLeft>0x04</DigitsLeft>',
+        '-0032.00',
+        id='negative_no_slz'),
+    pytest.param(
+        b'0x00000010',
+        b'    <DigitsRight>0x02</DigitsRight>'
+        b'    <DigitsLeft>0x04</DigitsLeft>',
+        '0032.00',
+        id='no_slz'),
+    pytest.param(
+        b'0x00000010',
+        b'    <DigitsLeft>0x04</DigitsLeft>'
+        b'    <SuppressLeadingZero>N</SuppressLeadingZero>',
+        '0032.0',
+        id='no_digits_right'),
+    pytest.param(
+        b'0x00000010',
+        b'    <DigitsRight>0x02</DigitsRight>'
+        b'    <SuppressLeadingZero>N</SuppressLeadingZero>',
+        '32.00',
+        id='no_digits_left'),
+))
+async def test_get_instantaneous_demand(
+    demand, formatting, expected, mock_server, raven_client,
+):
     """
-    Verify behavior of the ``get_instantaneous_demand`` command with a
-    negative value and without SuppressLeadingZero.
+    Verify behavior of the ``get_instantaneous_demand`` command with
+    various demand values and formatting fields.
     """
     responses = {
-        b'<Command><Name>get_instantaneous_demand</Name></Command>':
+        _REQ_GET_INSTANTANEOUS_DEMAND:
             b'<InstantaneousDemand>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
             b'    <TimeStamp>0x29bd58a7</TimeStamp>'
-            b'    <Demand>0xFFFFFFF0</Demand>'
+            b'    <Demand>' + demand + b'</Demand>'
             b'    <Multiplier>0x00000004</Multiplier>'
-            b'    <Divisor>0x00000002</Divisor>'
-            b'    <DigitsRight>0x02</DigitsRight>'
-            b'    <DigitsLeft>0x04</DigitsLeft>'
+            b'    <Divisor>0x00000002</Divisor>' + formatting +
             b'</InstantaneousDemand>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_instantaneous_demand()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_instantaneous_demand()
 
     assert actual == InstantaneousDemand(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        demand='-0032.00')
+        device_mac_id=_MAC_DEVICE,
+        meter_mac_id=_MAC_METER_A,
+        time_stamp=_TIME_STAMP,
+        demand=expected)
 
 
-@pytest.mark.asyncio
-async def test_get_instantaneous_demand_no_slz():
-    """
-    Verify behavior of the ``get_instantaneous_demand`` command without
-    SuppressLeadingZero.
-    """
-    responses = {
-        b'<Command><Name>get_instantaneous_demand</Name></Command>':
-            b'<InstantaneousDemand>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'    <TimeStamp>0x29bd58a7</TimeStamp>'
-            b'    <Demand>0x00000010</Demand>'
-            b'    <Multiplier>0x00000004</Multiplier>'
-            b'    <Divisor>0x00000002</Divisor>'
-            b'    <DigitsRight>0x02</DigitsRight>'
-            b'    <DigitsLeft>0x04</DigitsLeft>'
-            b'</InstantaneousDemand>',
-    }
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_instantaneous_demand()
-
-    assert actual == InstantaneousDemand(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        demand='0032.00')
-
-
-@pytest.mark.asyncio
-async def test_get_instantaneous_demand_no_digits_right():
-    """
-    Verify behavior of the ``get_instantaneous_demand`` command without
-    DigitsRight.
-    """
-    responses = {
-        b'<Command><Name>get_instantaneous_demand</Name></Command>':
-            b'<InstantaneousDemand>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'    <TimeStamp>0x29bd58a7</TimeStamp>'
-            b'    <Demand>0x00000010</Demand>'
-            b'    <Multiplier>0x00000004</Multiplier>'
-            b'    <Divisor>0x00000002</Divisor>'
-            b'    <DigitsLeft>0x04</DigitsLeft>'
-            b'    <SuppressLeadingZero>N</SuppressLeadingZero>'
-            b'</InstantaneousDemand>',
-    }
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_instantaneous_demand()
-
-    assert actual == InstantaneousDemand(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        demand='0032.0')
-
-
-@pytest.mark.asyncio
-async def test_get_instantaneous_demand_no_digits_left():
-    """
-    Verify behavior of the ``get_instantaneous_demand`` command without
-    DigitsLeft.
-    """
-    responses = {
-        b'<Command><Name>get_instantaneous_demand</Name></Command>':
-            b'<InstantaneousDemand>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'    <TimeStamp>0x29bd58a7</TimeStamp>'
-            b'    <Demand>0x00000010</Demand>'
-            b'    <Multiplier>0x00000004</Multiplier>'
-            b'    <Divisor>0x00000002</Divisor>'
-            b'    <DigitsRight>0x02</DigitsRight>'
-            b'    <SuppressLeadingZero>N</SuppressLeadingZero>'
-            b'</InstantaneousDemand>',
-    }
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_instantaneous_demand()
-
-    assert actual == InstantaneousDemand(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        demand='32.00')
-
-
-@pytest.mark.asyncio
-async def test_get_last_period_usage():
+async def test_get_last_period_usage(mock_server, raven_client):
     """Verify behavior of the ``get_last_period_usage`` command."""
     responses = {
-        b'<Command><Name>get_last_period_usage</Name></Command>':
+        _REQ_GET_LAST_PERIOD_USAGE:
             b'<LastPeriodUsage>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -562,25 +473,22 @@ async def test_get_last_period_usage():
             b'</LastPeriodUsage>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_last_period_usage()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_last_period_usage()
 
     assert actual == LastPeriodUsage(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
+        device_mac_id=_MAC_DEVICE,
+        meter_mac_id=_MAC_METER_A,
         last_usage='0032.00',
-        start_date=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
+        start_date=_TIME_STAMP,
         end_date=datetime(
             2022, 4, 11, 0, 47, 35, tzinfo=timezone.utc))
 
 
-@pytest.mark.asyncio
-async def test_get_message():
+async def test_get_message(mock_server, raven_client):
     """Verify behavior of the ``get_message`` command."""
     responses = {
-        b'<Command><Name>get_message</Name></Command>':
+        _REQ_GET_MESSAGE:
             b'<MessageCluster>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -593,27 +501,24 @@ async def test_get_message():
             b'</MessageCluster>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_message()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_message()
 
     assert actual == MessageCluster(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        time_stamp=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
-        message_id=bytes.fromhex('02468ACE'),
+        device_mac_id=_MAC_DEVICE,
+        meter_mac_id=_MAC_METER_A,
+        time_stamp=_TIME_STAMP,
+        message_id=_MSG_ID,
         text='Hello, World!',
         confirmation_required=False,
         confirmed=True,
         queue=MessageQueue.ACTIVE)
 
 
-@pytest.mark.asyncio
-async def test_get_meter_info():
+async def test_get_meter_info(mock_server, raven_client):
     """Verify behavior of the ``get_meter_info`` command."""
     responses = {
-        b'<Command><Name>get_meter_info</Name></Command>':
+        _REQ_GET_METER_INFO:
             b'<MeterInfo>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -626,13 +531,12 @@ async def test_get_meter_info():
             b'</MeterInfo>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_meter_info()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_meter_info()
 
     assert actual == MeterInfo(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
+        device_mac_id=_MAC_DEVICE,
+        meter_mac_id=_MAC_METER_A,
         meter_type=MeterType.ELECTRIC,
         nick_name='House',
         account='8675309',
@@ -641,11 +545,10 @@ async def test_get_meter_info():
         enabled=True)
 
 
-@pytest.mark.asyncio
-async def test_get_network_info():
+async def test_get_network_info(mock_server, raven_client):
     """Verify behavior of the ``get_network_info`` command."""
     responses = {
-        b'<Command><Name>get_network_info</Name></Command>':
+        _REQ_GET_NETWORK_INFO:
             b'<NetworkInfo>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <CoordMacId>0xFEDCBA9876543210</CoordMacId>'
@@ -659,94 +562,59 @@ async def test_get_network_info():
             b'</NetworkInfo>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_network_info()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_network_info()
 
     assert actual == NetworkInfo(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        coord_mac_id=bytes.fromhex('FEDCBA9876543210'),
+        device_mac_id=_MAC_DEVICE,
+        coord_mac_id=_MAC_METER_A,
         status=ConnectionState.CONNECTED,
         description='Network is operational',
-        status_code=bytes.fromhex('42'),
-        ext_pan_id=bytes.fromhex('9876543210ABCDEF'),
+        status_code=_STATUS_CODE,
+        ext_pan_id=_EXT_PAN,
         channel=24,
-        short_addr=bytes.fromhex('5678'),
+        short_addr=_SHORT_ADDR,
         link_strength=36)
 
 
-@pytest.mark.asyncio
-async def test_get_meter_list_zero():
+@pytest.mark.parametrize('response,meter_mac_ids', (
+    pytest.param(_RES_METER_LIST, [], id='zero'),
+    pytest.param(
+        b'<MeterList>'
+        b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
+        b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
+        b'</MeterList>',
+        [_MAC_METER_A],
+        id='one'),
+    pytest.param(
+        b'<MeterList>'
+        b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
+        b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
+        b'    <MeterMacId>0xfedcba0123456789</MeterMacId>'
+        b'</MeterList>',
+        [_MAC_METER_A, _MAC_METER_B],
+        id='two'),
+))
+async def test_get_meter_list(
+    response, meter_mac_ids, mock_server, raven_client,
+):
     """Verify behavior of the ``get_meter_list`` command."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'</MeterList>',
+        _REQ_GET_METER_LIST: response,
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_meter_list()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_meter_list()
 
     assert actual == MeterList(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_ids=[])
+        device_mac_id=_MAC_DEVICE,
+        meter_mac_ids=meter_mac_ids)
 
 
-@pytest.mark.asyncio
-async def test_get_meter_list_one():
-    """Verify behavior of the ``get_meter_list`` command."""
-    responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'</MeterList>',
-    }
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_meter_list()
-
-    assert actual == MeterList(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_ids=[bytes.fromhex('FEDCBA9876543210')])
-
-
-@pytest.mark.asyncio
-async def test_get_meter_list_two():
-    """Verify behavior of the ``get_meter_list`` command."""
-    responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
-            b'    <MeterMacId>0xfedcba0123456789</MeterMacId>'
-            b'</MeterList>',
-    }
-
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_meter_list()
-
-    assert actual == MeterList(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_ids=[
-            bytes.fromhex('FEDCBA9876543210'),
-            bytes.fromhex('FEDCBA0123456789')])
-
-
-@pytest.mark.asyncio
-async def test_get_profile_data():
+async def test_get_profile_data(mock_server, raven_client):
     """Verify behavior of the ``get_profile_data`` command."""
     responses = {
-        b'<Command>'
-        b'<Name>get_profile_data</Name>'
-        b'<NumberOfPeriods>0x02</NumberOfPeriods>'
-        b'<EndTime>0x29bd58a7</EndTime>'
-        b'<IntervalChannel>Delivered</IntervalChannel>'
-        b'</Command>':
+        _REQ_GET_PROFILE_DATA:
             b'<ProfileData>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -756,26 +624,23 @@ async def test_get_profile_data():
             b'</ProfileData>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_profile_data(
-                2, '0x29bd58a7',
-                IntervalChannel.DELIVERED)
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_profile_data(
+            2, '0x29bd58a7',
+            IntervalChannel.DELIVERED)
 
     assert actual == ProfileData(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        end_time=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
+        device_mac_id=_MAC_DEVICE,
+        meter_mac_id=_MAC_METER_A,
+        end_time=_TIME_STAMP,
         status=DataStatus.SUCCESS,
         profile_interval_period=IntervalPeriod.THIRTY_MIN)
 
 
-@pytest.mark.asyncio
-async def test_get_schedule():
+async def test_get_schedule(mock_server, raven_client):
     """Verify behavior of the ``get_schedule`` command."""
     responses = {
-        b'<Command><Name>get_schedule</Name></Command>':
+        _REQ_GET_SCHEDULE:
             b'<ScheduleInfo>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -785,23 +650,21 @@ async def test_get_schedule():
             b'</ScheduleInfo>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_schedule()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_schedule()
 
     assert actual == ScheduleInfo(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
+        device_mac_id=_MAC_DEVICE,
+        meter_mac_id=_MAC_METER_A,
         event=ScheduledEvent.SUMMATION,
         frequency=timedelta(seconds=0x13579bdf),
         enabled=True)
 
 
-@pytest.mark.asyncio
-async def test_get_time():
+async def test_get_time(mock_server, raven_client):
     """Verify behavior of the ``get_time`` command."""
     responses = {
-        b'<Command><Name>get_time</Name></Command>':
+        _REQ_GET_TIME:
             b'<TimeCluster>'
             b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
             b'    <MeterMacId>0xFEDCBA9876543210</MeterMacId>'
@@ -810,159 +673,153 @@ async def test_get_time():
             b'</TimeCluster>',
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            actual = await dut.get_time()
+    async with mock_device(responses, server=mock_server):
+        actual = await raven_client.get_time()
 
     assert actual == TimeCluster(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
-        meter_mac_id=bytes.fromhex('FEDCBA9876543210'),
-        utc_time=datetime(
-            2022, 3, 11, 0, 47, 35, tzinfo=timezone.utc),
+        device_mac_id=_MAC_DEVICE,
+        meter_mac_id=_MAC_METER_A,
+        utc_time=_TIME_STAMP,
         local_time=datetime(2022, 3, 10, 16, 47, 35))
 
 
-@pytest.mark.asyncio
 async def test_device_synchronize_clean():
     """Verify behavior of the ``synchronize`` helper."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'</MeterList>',
+        _REQ_GET_METER_LIST: _RES_METER_LIST,
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            await dut.synchronize()
+    async with mock_memory_device(responses) as dut:
+        await dut.synchronize()
 
 
-@pytest.mark.asyncio
 async def test_device_synchronize_pre_leftovers():
     """Verify behavior of the ``synchronize`` helper."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-            b'</MeterList>',
+        _REQ_GET_METER_LIST: _RES_METER_LIST,
     }
 
-    async with mock_device(responses, b'</Leftovers>') as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            await dut.synchronize()
+    async with mock_memory_device(responses, b'</Leftovers>') as dut:
+        await dut.synchronize()
 
 
-@pytest.mark.asyncio
 async def test_device_synchronize_post_leftovers():
     """Verify behavior of the ``synchronize`` helper."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            [
-                b'</Leftovers>\n'
-                b'<MeterList>'
-                b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-                b'</MeterList>',
-                b'<MeterList>'
-                b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-                b'</MeterList>',
-            ],
+        _REQ_GET_METER_LIST:
+            [b'</Leftovers>\n' + _RES_METER_LIST, _RES_METER_LIST],
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            await dut.synchronize()
+    async with mock_memory_device(responses) as dut:
+        await dut.synchronize()
 
 
-@pytest.mark.asyncio
 async def test_device_synchronize_persistent_leftovers():
     """Verify behavior of the ``synchronize`` helper."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            [
-                b'</Leftovers>\n'
-                b'<MeterList>'
-                b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-                b'</MeterList>',
-            ] * 3,
+        _REQ_GET_METER_LIST:
+            [b'</Leftovers>\n' + _RES_METER_LIST] * 3,
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            with pytest.raises(RAVEnConnectionError):
-                await dut.synchronize()
+    async with mock_memory_device(responses) as dut:
+        with pytest.raises(RAVEnConnectionError):
+            await dut.synchronize()
+
+
+async def test_device_synchronize_chatty():
+    """Verify that the ``synchronize`` helper gives up draining in time."""
+    responses = {
+        _REQ_GET_METER_LIST: _RES_METER_LIST,
+    }
+
+    async with mock_memory_device(responses) as dut:
+        protocol = dut._writer._protocol
+
+        async def chatter():
+            while True:
+                protocol.data_received(b'<Noise></Noise>')
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(chatter())
+        try:
+            await asyncio.wait_for(dut.synchronize(), 1.0)
+        finally:
+            task.cancel()
 
 
-@pytest.mark.asyncio
 async def test_device_synchronize_timeouts():
     """Verify behavior of the 'synchronize' helper timeouts."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            [b''] * 4 + [
-                b'<MeterList>'
-                b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
-                b'</MeterList>',
-            ],
+        _REQ_GET_METER_LIST:
+            [b''] * 4 + [_RES_METER_LIST],
     }
 
-    async with mock_device(responses) as (host, port):
-        async with RAVEnNetworkDevice(host, port) as dut:
-            with pytest.raises(asyncio.TimeoutError):
-                await dut.synchronize(retries=3, timeout=0.05)
-            await dut.synchronize()
+    async with mock_memory_device(responses) as dut:
+        with pytest.raises(asyncio.TimeoutError):
+            await dut.synchronize(retries=3, timeout=0.001)
+        await dut.synchronize()
 
 
-@pytest.mark.asyncio
 async def test_device_warning_generic():
     """Verify behavior of the ``get_meter_list`` command."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<Warning>'
-            b'    <Text>Something unexpected happened</Text>'
-            b'</Warning>',
+        _REQ_GET_METER_LIST: _RES_WARNING_GENERIC,
+        _REQ_GET_DEVICE_INFO:
+            b'<DeviceInfo>'
+            b'    <DeviceMacId>0x0123456789ABCDEF</DeviceMacId>'
+            b'</DeviceInfo>',
     }
 
-    with warnings.catch_warnings(record=True) as w:
-        async with mock_device(responses) as (host, port):
-            async with RAVEnNetworkDevice(host, port) as dut:
-                with pytest.raises(asyncio.TimeoutError):
-                    await asyncio.wait_for(dut.get_meter_list(), timeout=0.05)
+    with pytest.warns(RAVEnWarning, match='Something unexpected happened'):
+        async with mock_memory_device(responses) as dut:
+            task = asyncio.create_task(dut.get_meter_list())
+            await asyncio.sleep(0)
+            # Stanzas are handled in order, so the warning has been
+            # processed by the time the later response arrives
+            assert await dut.get_device_info()
+            assert not task.done()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
 
-        assert len(w) == 1
-        assert issubclass(w[-1].category, RAVEnWarning)
-        assert 'Something unexpected happened' in str(w[-1].message)
 
-
-@pytest.mark.asyncio
+@pytest.mark.filterwarnings('error::aioraven.device.RAVEnWarning')
 async def test_device_warning_generic_error():
     """Verify behavior of generic device warnings."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<Warning>'
-            b'    <Text>Something unexpected happened</Text>'
-            b'</Warning>',
+        _REQ_GET_METER_LIST: _RES_WARNING_GENERIC,
+    }
+
+    async with mock_memory_device(responses) as dut:
+        with pytest.raises(RAVEnWarning):
+            await dut.get_meter_list()
+
+
+@pytest.mark.filterwarnings('error::aioraven.device.RAVEnWarning')
+async def test_device_warning_generic_error_repeat():
+    """Verify behavior of queries after a generic device warning."""
+    responses = {
+        _REQ_GET_METER_LIST: _RES_WARNING_GENERIC,
     }
 
-    with warnings.catch_warnings():
-        warnings.simplefilter('error', RAVEnWarning)
-        async with mock_device(responses) as (host, port):
-            async with RAVEnNetworkDevice(host, port) as dut:
-                with pytest.raises(RAVEnWarning):
-                    await dut.get_meter_list()
+    async with mock_memory_device(responses) as dut:
+        with pytest.raises(RAVEnWarning):
+            await dut.get_meter_list()
+        with pytest.raises(RAVEnWarning):
+            await dut.get_meter_list()
+        await dut.close_current_period()
 
 
-@pytest.mark.asyncio
+@pytest.mark.filterwarnings('error::aioraven.device.RAVEnWarning')
 async def test_device_warning_unknown_command():
     """Verify behavior of the ``Unknown command`` device warning."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
+        _REQ_GET_METER_LIST:
             b'<Warning>'
             b'    <Text>Unknown command</Text>'
             b'</Warning>',
     }
 
-    with warnings.catch_warnings():
-        warnings.simplefilter('error', RAVEnWarning)
-        async with mock_device(responses) as (host, port):
-            async with RAVEnNetworkDevice(host, port) as dut:
-                with pytest.raises(UnknownRAVEnCommandWarning):
-                    await dut.get_meter_list()
+    async with mock_memory_device(responses) as dut:
+        with pytest.raises(UnknownRAVEnCommandWarning):
+            await dut.get_meter_list()
@@ -0,0 +1,75 @@
+# Copyright 2022 Scott K Logan
+# Licensed under the Apache License, Version 2.0
+
+from collections import Counter
+
+from .mock_device import _RepeatList
+from .mock_device import _ResponseMatcher
+
+
+def test_matcher_single():
+    """Verify that a complete request yields its response."""
+    responses = {b'<A></A>': b'<B></B>'}
+    matcher = _ResponseMatcher(responses)
+
+    assert matcher.feed(b'<A></A>') == [b'<B></B>']
+    assert matcher.served == {b'<A></A>': 1}
+    assert matcher.feed(b'<A></A>') == []
+    assert responses == {b'<A></A>': b'<B></B>'}
+
+
+def test_matcher_fragmented():
+    """Verify that a request split across reads is matched."""
+    responses = {b'<A></A>': b'<B></B>'}
+    matcher = _ResponseMatcher(responses)
+
+    assert matcher.feed(b'  <A>') == []
+    assert matcher.feed(b'</A>') == [b'<B></B>']
+
+
+def test_matcher_multiple():
+    """Verify that several requests in one read are all matched."""
+    responses = {
+        b'<A></A>': [b'<B></B>', None, b'<C></C>'],
+        b'<D></D>': None,
+    }
+    matcher = _ResponseMatcher(responses)
+
+    assert matcher.feed(b'<A></A><D></D>\n<A></A>') == [b'<B></B>']
+    assert matcher.feed(b'<A></A>rest') == [b'<C></C>']
+    assert matcher.served == {b'<A></A>': 3, b'<D></D>': 1}
+    assert matcher.feed(b'<A></A>') == []
+
+
+def test_matcher_prefix():
+    """Verify that the shorter of two overlapping requests wins."""
+    responses = {
+        b'<A></A><A></A>': b'long',
+        b'<A></A>': b'short',
+    }
+    matcher = _ResponseMatcher(responses)
+
+    assert matcher.feed(b'<A></A><A></A>') == [b'short']
+    assert matcher.served == {b'<A></A>': 1}
+
+
+def test_matcher_consumed_elsewhere():
+    """Verify that responses consumed by another matcher are skipped."""
+    responses = {
+        b'<A></A>': b'short',
+        b'<A></A><B></B>': b'long',
+    }
+    served = Counter()
+    matcher = _ResponseMatcher(responses, served)
+    served[b'<A></A>'] += 1
+
+    assert matcher.feed(b'<A></A><B></B>') == [b'long']
+
+
+def test_matcher_repeat():
+    """Verify that the last of a repeating list of responses is reused."""
+    responses = {b'<A></A>': _RepeatList((b'<B></B>', b'<C></C>'))}
+    matcher = _ResponseMatcher(responses)
+
+    assert matcher.feed(b'<A></A><A></A><A></A>') == [
+        b'<B></B>', b'<C></C>', b'<C></C>']
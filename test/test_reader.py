@@ -0,0 +1,54 @@
+# Copyright 2022 Scott K Logan
+# Licensed under the Apache License, Version 2.0
+
+import asyncio
+
+from aioraven.protocols import RAVEnReaderProtocol
+from aioraven.reader import RAVEnReader
+
+
+def _connect(reader):
+    protocol = RAVEnReaderProtocol(reader)
+    protocol.connection_made(asyncio.Transport())
+    return protocol
+
+
+async def test_single_element():
+    """Verify that a registered waiter receives its stanza."""
+    reader = RAVEnReader()
+    protocol = _connect(reader)
+
+    waiter = reader.register_tag_waiter('FooBar')
+    protocol.data_received(b'<FooBar><Baz>Qux</Baz></FooBar>')
+
+    assert await waiter == {'Baz': 'Qux'}
+
+
+async def test_multiple_elements():
+    """Verify that repeated child tags are collected into a list."""
+    reader = RAVEnReader()
+    protocol = _connect(reader)
+
+    waiter = reader.register_tag_waiter('FooBar')
+    protocol.data_received(
+        b'<FooBar><Baz>Qux</Baz><Baz>Quux</Baz><Corge/></FooBar>')
+
+    assert await waiter == {'Baz': ['Qux', 'Quux'], 'Corge': None}
+
+
+async def test_other_element():
+    """Verify that unclaimed stanzas go to the catch-all waiter."""
+    reader = RAVEnReader()
+    protocol = _connect(reader)
+
+    waiter = reader.register_tag_waiter('FooBar')
+    other = reader.register_tag_waiter()
+    protocol.data_received(b'<Other><Baz>Qux</Baz></Other>')
+
+    assert await other == {'Baz': 'Qux'}
+    assert not waiter.done()
+
+    protocol.eof_received()
+
+    assert await waiter is None
+    assert await reader.register_tag_waiter('FooBar') is None
@@ -10,7 +10,12 @@ from aioraven.device import RAVEnNotOpenError
 from aioraven.serial import RAVEnSerialDevice
 import pytest
 
+from .mock_device import MAC_DEVICE
 from .mock_device import mock_pty_device
+from .mock_device import REQ_GET_DEVICE_INFO
+from .mock_device import REQ_GET_METER_LIST
+from .mock_device import RES_DEVICE_INFO
+from .mock_device import RES_METER_LIST
 
 
 if os.name == 'nt':
@@ -19,14 +24,10 @@ if os.name == 'nt':
         allow_module_level=True)
 
 
-@pytest.mark.asyncio
 async def test_serial_data():
     """Verify simple device query behavior."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</MeterList>',
+        REQ_GET_METER_LIST: RES_METER_LIST,
     }
 
     async with mock_pty_device(responses) as mock_device:
@@ -34,18 +35,14 @@ async def test_serial_data():
             actual = await dut.get_meter_list()
 
     assert actual == MeterList(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
+        device_mac_id=MAC_DEVICE,
         meter_mac_ids=[])
 
 
-@pytest.mark.asyncio
 async def test_serial_disconnect():
     """Verify behavior when a device is unexpectedly disconnected."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</MeterList>',
+        REQ_GET_METER_LIST: RES_METER_LIST,
     }
 
     async with mock_pty_device(responses) as mock_device:
@@ -59,15 +56,10 @@ async def test_serial_disconnect():
             await dut.get_meter_list()
 
 
-@pytest.mark.asyncio
 async def test_serial_incomplete():
     """Verify behavior when a partial fragment is received."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</MeterList>'
-            b'<DeviceInfo>'
+        REQ_GET_METER_LIST: RES_METER_LIST + b'<DeviceInfo>',
     }
 
     async with mock_pty_device(responses) as mock_device:
@@ -76,13 +68,13 @@ async def test_serial_incomplete():
         assert await dut.get_meter_list()
 
         task = asyncio.create_task(dut.get_meter_list())
-        await asyncio.wait((task,), timeout=0.05)
+        # Let the query register its waiter before the device goes away
+        await asyncio.sleep(0)
     async with dut:
         with pytest.raises(RAVEnConnectionError):
             assert not await task
 
 
-@pytest.mark.asyncio
 async def test_serial_not_open():
     """Verify behavior when reading from an unopened device."""
     async with mock_pty_device({}) as mock_device:
@@ -91,16 +83,11 @@ async def test_serial_not_open():
             await dut.get_device_info()
 
 
-@pytest.mark.asyncio
 async def test_serial_parse_error():
     """Verify behavior when invalid syntax is received."""
     responses = {
-        b'<Command><Name>get_device_info</Name></Command>':
-            b'</DeviceInfo>',
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</MeterList>',
+        REQ_GET_DEVICE_INFO: b'</DeviceInfo>',
+        REQ_GET_METER_LIST: RES_METER_LIST,
     }
 
     async with mock_pty_device(responses) as mock_device:
@@ -110,11 +97,10 @@ async def test_serial_parse_error():
             actual = await dut.get_meter_list()
 
     assert actual == MeterList(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
+        device_mac_id=MAC_DEVICE,
         meter_mac_ids=[])
 
 
-@pytest.mark.asyncio
 async def test_serial_repr():
     """Verify representation of a serial device."""
     async with mock_pty_device({}) as mock_device:
@@ -122,24 +108,19 @@ async def test_serial_repr():
             assert 'RAVEnSerialDevice' in str(dut)
 
 
-@pytest.mark.asyncio
 async def test_serial_timeout_recovery():
     """Verify device recovery after a timeout."""
     responses = {
-        b'<Command><Name>get_device_info</Name></Command>':
-            b'<DeviceInfo>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</DeviceInfo>',
-        b'<Command><Name>get_meter_list</Name></Command>': b'',
+        REQ_GET_DEVICE_INFO: RES_DEVICE_INFO,
+        REQ_GET_METER_LIST: b'',
     }
     async with mock_pty_device(responses) as mock_device:
         async with RAVEnSerialDevice(mock_device) as dut:
             with pytest.raises(asyncio.TimeoutError):
-                await asyncio.wait_for(dut.get_meter_list(), 0.05)
+                await asyncio.wait_for(dut.get_meter_list(), 0.001)
             assert await dut.get_device_info()
 
 
-@pytest.mark.asyncio
 async def test_serial_abort():
     """Verify behavior of device abort."""
     async with mock_pty_device({}) as mock_device:
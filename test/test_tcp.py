@@ -10,39 +10,36 @@ from aioraven.streams import open_connection
 from aioraven.streams import RAVEnNetworkDevice
 import pytest
 
+from .mock_device import MAC_DEVICE
 from .mock_device import mock_device
+from .mock_device import REQ_GET_DEVICE_INFO
+from .mock_device import REQ_GET_METER_LIST
+from .mock_device import RES_DEVICE_INFO
+from .mock_device import RES_METER_LIST
 
 
-@pytest.mark.asyncio
-async def test_tcp_data():
+async def test_tcp_data(mock_server):
     """Verify simple device query behavior."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</MeterList>',
+        REQ_GET_METER_LIST: RES_METER_LIST,
     }
 
-    async with mock_device(responses) as (host, port):
+    async with mock_device(responses, server=mock_server) as (host, port):
         async with RAVEnNetworkDevice(host, port) as dut:
             actual = await dut.get_meter_list()
 
     assert actual == MeterList(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
+        device_mac_id=MAC_DEVICE,
         meter_mac_ids=[])
 
 
-@pytest.mark.asyncio
-async def test_tcp_disconnect():
+async def test_tcp_disconnect(mock_server):
     """Verify behavior when a device is unexpectedly disconnected."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</MeterList>',
+        REQ_GET_METER_LIST: RES_METER_LIST,
     }
 
-    async with mock_device(responses) as (host, port):
+    async with mock_device(responses, server=mock_server) as (host, port):
         dut = RAVEnNetworkDevice(host, port)
         await dut.open()
         assert await dut.get_meter_list()
@@ -51,66 +48,55 @@ async def test_tcp_disconnect():
         assert not await dut.get_meter_list()
 
 
-@pytest.mark.asyncio
-async def test_tcp_incomplete():
+async def test_tcp_incomplete(mock_server):
     """Verify behavior when a partial fragment is received."""
     responses = {
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</MeterList>'
-            b'<DeviceInfo>'
+        REQ_GET_METER_LIST: RES_METER_LIST + b'<DeviceInfo>',
     }
 
-    async with mock_device(responses) as (host, port):
+    async with mock_device(responses, server=mock_server) as (host, port):
         dut = RAVEnNetworkDevice(host, port)
         await dut.open()
         assert await dut.get_meter_list()
 
         task = asyncio.create_task(dut.get_meter_list())
-        await asyncio.wait((task,), timeout=0.05)
+        # Let the query register its waiter before the device goes away
+        await asyncio.sleep(0)
     async with dut:
         with pytest.raises(RAVEnConnectionError):
             await task
         assert not await dut.get_meter_list()
 
 
-@pytest.mark.asyncio
-async def test_tcp_not_open():
+async def test_tcp_not_open(mock_server):
     """Verify behavior when reading from an unopened device."""
-    async with mock_device() as (host, port):
+    async with mock_device(server=mock_server) as (host, port):
         dut = RAVEnNetworkDevice(host, port)
         with pytest.raises(RAVEnNotOpenError):
             await dut.get_device_info()
 
 
-@pytest.mark.asyncio
-async def test_tcp_parse_error():
+async def test_tcp_parse_error(mock_server):
     """Verify behavior when invalid syntax is received."""
     responses = {
-        b'<Command><Name>get_device_info</Name></Command>':
-            b'</DeviceInfo>',
-        b'<Command><Name>get_meter_list</Name></Command>':
-            b'<MeterList>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</MeterList>',
+        REQ_GET_DEVICE_INFO: b'</DeviceInfo>',
+        REQ_GET_METER_LIST: RES_METER_LIST,
     }
 
-    async with mock_device(responses) as (host, port):
+    async with mock_device(responses, server=mock_server) as (host, port):
         async with RAVEnNetworkDevice(host, port) as dut:
             with pytest.raises(RAVEnConnectionError):
                 await dut.get_device_info()
             actual = await dut.get_meter_list()
 
     assert actual == MeterList(
-        device_mac_id=bytes.fromhex('0123456789ABCDEF'),
+        device_mac_id=MAC_DEVICE,
         meter_mac_ids=[])
 
 
-@pytest.mark.asyncio
-async def test_tcp_repr():
+async def test_tcp_repr(mock_server):
     """Verify representation of a network device."""
-    async with mock_device() as (host, port):
+    async with mock_device(server=mock_server) as (host, port):
         async with RAVEnNetworkDevice(host, port) as dut:
             assert 'RAVEnNetworkDevice' in str(dut)
 
@@ -122,27 +108,22 @@ async def test_tcp_repr():
             writer.close()
 
 
-@pytest.mark.asyncio
-async def test_tcp_timeout_recovery():
+async def test_tcp_timeout_recovery(mock_server):
     """Verify device recovery after a timeout."""
     responses = {
-        b'<Command><Name>get_device_info</Name></Command>':
-            b'<DeviceInfo>'
-            b'    <DeviceMacId>0x0123456789abcdef</DeviceMacId>'
-            b'</DeviceInfo>',
-        b'<Command><Name>get_meter_list</Name></Command>': b'',
+        REQ_GET_DEVICE_INFO: RES_DEVICE_INFO,
+        REQ_GET_METER_LIST: b'',
     }
-    async with mock_device(responses) as (host, port):
+    async with mock_device(responses, server=mock_server) as (host, port):
         async with RAVEnNetworkDevice(host, port) as dut:
             with pytest.raises(asyncio.TimeoutError):
-                await asyncio.wait_for(dut.get_meter_list(), 0.05)
+                await asyncio.wait_for(dut.get_meter_list(), 0.001)
             assert await dut.get_device_info()
 
 
-@pytest.mark.asyncio
-async def test_tcp_abort():
+async def test_tcp_abort(mock_server):
     """Verify behavior of device abort."""
-    async with mock_device({}) as (host, port):
+    async with mock_device({}, server=mock_server) as (host, port):
         async with RAVEnNetworkDevice(host, port) as dut:
             await dut.abort()
         await dut.abort()